@@ -2,13 +2,24 @@ import asyncio
 import json
 import os
 import re
+import statistics
 import time
+import uuid
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, Optional
 
+import aiofiles
+import aiohttp
+from playwright.async_api import Error as PlaywrightError
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from playwright.async_api import async_playwright
+from yarl import URL
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 @dataclass(frozen=True)
@@ -32,20 +43,157 @@ SPECS = [
     ),
 ]
 
+# sites to advance past before progress.json is rewritten
+PROGRESS_FLUSH_EVERY = 10
+# adaptive stage timeouts: once TIMEOUT_MIN_SAMPLES successes are in, a stage
+# may take TIMEOUT_FACTOR x its recent median (never less than the floor)
+TIMEOUT_WINDOW = 9
+TIMEOUT_MIN_SAMPLES = 3
+TIMEOUT_FACTOR = 5
+TIMEOUT_FLOOR_MS = 5_000
+# consecutive timeouts of a stage before its limit is doubled (up to the
+# default); each success halves it back
+TIMEOUT_WIDEN_AFTER = 5
+
+# seconds to wait for the site list response before scraping the dropdown
+SITE_LIST_TIMEOUT = 10.0
+# fewer intercepted ids than this is taken as the wrong list (the dropdown
+# has ~70 sites); the dropdown is scraped instead
+SITE_LIST_MIN_IDS = 10
+# upper bound on scrolling the site dropdown when the list never settles
+SITE_SCROLL_DEADLINE_MS = 30_000
+# concurrent HEAD requests when probing site ids, see probe_live_ids()
+PROBE_CONCURRENCY = 32
+# newly resolved site ids to collect before site_id_map.json is rewritten
+ID_MAP_FLUSH_EVERY = 25
+
+
+# headless scraping needs none of these; trims per-page overhead and RSS so
+# more worker contexts fit in memory
+CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-features=TranslateUI,BlinkGenPropertyTrees",
+]
+
+VIEWPORT = {"width": 1280, "height": 800}
+
+# nothing the CSV export depends on; skipped to cut page-load time
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet"}
+BLOCKED_URL_PARTS = ("google-analytics", "googletagmanager", "doubleclick")
+# the same, as URL patterns for CDP Network.setBlockedURLs (profile mode)
+BLOCKED_EXTENSIONS = (
+    *("png", "jpg", "jpeg", "gif", "webp", "ico"),
+    *("woff", "woff2", "ttf", "otf", "mp4", "webm", "css"),
+)
+BLOCKED_URL_PATTERNS = [
+    *(f"*.{ext}" for ext in BLOCKED_EXTENSIONS),
+    *(f"*.{ext}?*" for ext in BLOCKED_EXTENSIONS),
+    *(f"*{part}*" for part in BLOCKED_URL_PARTS),
+]
+
+
+_RE_APOS = re.compile(r"[’'`]")
+_RE_NONALNUM = re.compile(r"[^a-z0-9]+")
+_RE_MULTI_UNDERSCORE = re.compile(r"_+")
+
 
 def slugify_site_name(name: str) -> str:
     s = name.strip().lower()
     s = s.replace("&", " and ")
-    s = re.sub(r"[’'`]", "", s)
-    s = re.sub(r"[^a-z0-9]+", "_", s)
-    s = re.sub(r"_+", "_", s)
+    s = _RE_APOS.sub("", s)
+    s = _RE_NONALNUM.sub("_", s)
+    s = _RE_MULTI_UNDERSCORE.sub("_", s)
     return s.strip("_")
 
 
-async def get_site_name(page) -> Optional[str]:
+@dataclass
+class Timeouts:
+    """Per-stage timeouts (ms) that tighten to the durations actually seen."""
+
+    samples: Dict[str, deque] = field(default_factory=dict)
+    # consecutive timeouts per stage since the last success or widening
+    streaks: Dict[str, int] = field(default_factory=dict)
+    # multiplier on the adapted limit, grown by runs of timeouts
+    widen: Dict[str, float] = field(default_factory=dict)
+
+    def limit(self, stage: str, default_ms: float) -> float:
+        recent = self.samples.get(stage)
+        if not recent or len(recent) < TIMEOUT_MIN_SAMPLES:
+            return default_ms
+        adapted = TIMEOUT_FACTOR * statistics.median(recent)
+        adapted = max(TIMEOUT_FLOOR_MS, adapted) * self.widen.get(stage, 1.0)
+        return min(default_ms, adapted)
+
+    def record(self, stage: str, started: float) -> None:
+        recent = self.samples.setdefault(stage, deque(maxlen=TIMEOUT_WINDOW))
+        recent.append((time.monotonic() - started) * 1000)
+        self.streaks.pop(stage, None)
+        self.widen[stage] = max(1.0, self.widen.get(stage, 1.0) / 2)
+
+    def timed_out(self, stage: str) -> None:
+        # only successes are sampled, so without this a tightened limit could
+        # never grow back during a slowdown. A single timeout is most likely
+        # a dead site id and must stay cheap, so only a run of them widens it.
+        streak = self.streaks.get(stage, 0) + 1
+        if streak >= TIMEOUT_WIDEN_AFTER:
+            self.widen[stage] = self.widen.get(stage, 1.0) * 2
+            streak = 0
+        self.streaks[stage] = streak
+
+
+async def run_stage(
+    timeouts: Timeouts, stage: str, default_ms: float, wait, retry: bool = False
+):
+    """Await wait(timeout_ms) under the stage's adaptive limit.
+
+    retry: a timeout under a tightened limit is retried once at the default
+    before PlaywrightTimeoutError is let through. Only for stages that don't
+    signal a dead site id (nav, download); those must fail fast.
+    """
+    limit = timeouts.limit(stage, default_ms)
+    started = time.monotonic()
+    try:
+        result = await wait(limit)
+    except PlaywrightTimeoutError:
+        timeouts.timed_out(stage)
+        if not retry or limit >= default_ms:
+            raise
+        result = await wait(default_ms)
+    timeouts.record(stage, started)
+    return result
+
+
+async def open_page(page, url: str, timeouts: Timeouts) -> bool:
+    # only wait for the navigation to commit; callers gate on the element they
+    # actually need (site name, export button), which is the real readiness
+    try:
+        await run_stage(
+            timeouts,
+            "nav",
+            30_000,
+            lambda t: page.goto(url, wait_until="commit", timeout=t),
+            retry=True,
+        )
+    except PlaywrightTimeoutError:
+        return False
+    return True
+
+
+async def get_site_name(page, timeouts: Timeouts) -> Optional[str]:
     sel = "#select2-Select_site-container"
     try:
-        el = await page.wait_for_selector(sel, timeout=20_000)
+        el = await run_stage(
+            timeouts,
+            "site_name",
+            20_000,
+            lambda t: page.wait_for_selector(sel, timeout=t),
+        )
     except PlaywrightTimeoutError:
         return None
     title = await el.get_attribute("title")
@@ -55,128 +203,540 @@ async def get_site_name(page) -> Optional[str]:
     return txt or None
 
 
-async def download_csv(page, out_path: str) -> bool:
+async def bootstrap_site(
+    page, site_id: int, tabs: asyncio.Semaphore, timeouts: Timeouts
+) -> Optional[str]:
+    """Open a site's first spec and read its name off the rendered app."""
+    url = SPECS[0].url_template.format(SITE_ID=site_id)
+    # the permit is held until the app has booted, which is the actual load
+    async with tabs:
+        if not await open_page(page, url, timeouts):
+            return None
+        return await get_site_name(page, timeouts)
+
+
+async def download_csv(
+    page, out_path: str, timeouts: Timeouts, warm: bool
+) -> Optional[str]:
+    """Click the export button and save the CSV; returns the download URL.
+
+    warm: the page already had this URL loaded (the bootstrap page), so its
+    results wait is sampled apart from fresh tabs.
+    """
     button_sel = "#dload-data"
+    # the button is in the DOM before the results are; clicking it early is
+    # silently ignored and only surfaces as a download timeout
     try:
-        await page.wait_for_selector(button_sel, timeout=30_000)
+        await run_stage(
+            timeouts,
+            "results_warm" if warm else "results",
+            30_000,
+            lambda t: page.wait_for_function(
+                """
+                () => {
+                    const b = document.querySelector('#dload-data');
+                    return b && !b.disabled
+                        && document.querySelector('#chart0 svg, #resultsRegion0 table');
+                }
+                """,
+                timeout=t,
+            ),
+        )
     except PlaywrightTimeoutError:
-        return False
+        return None
 
-    try:
-        async with page.expect_download(timeout=45_000) as dl_info:
+    async def click_export(timeout_ms: float):
+        async with page.expect_download(timeout=timeout_ms) as dl_info:
             await page.click(button_sel)
-        dl = await dl_info.value
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-        await dl.save_as(out_path)
-        return True
+        return await dl_info.value
+
+    try:
+        dl = await run_stage(
+            timeouts, "download", 15_000, click_export, retry=True
+        )
     except PlaywrightTimeoutError:
+        return None
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    # move Playwright's temp file into place instead of copying it
+    src = await dl.path()
+    try:
+        os.replace(src, out_path)
+    except OSError:
+        # different filesystem
+        await dl.save_as(out_path)
+    return dl.url
+
+
+async def write_bytes_atomic(path: str, data: bytes) -> None:
+    # a temp file per call: two writes of the same file can't trip over
+    # each other's temp file, the last rename just wins. Plain open() rather
+    # than mkstemp so the file gets the usual umask mode, not 0600.
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        async with aiofiles.open(tmp_path, "xb") as f:
+            await f.write(data)
+        await asyncio.to_thread(os.replace, tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def is_site_csv(body: bytes, slug: str) -> bool:
+    """True if body starts like a SEER export: the quoted site name first."""
+    first_line = body.split(b"\n", 1)[0].decode("utf-8-sig", "replace").strip()
+    if len(first_line) < 2 or not (first_line[0] == first_line[-1] == '"'):
         return False
+    return slugify_site_name(first_line[1:-1]) == slug
+
+
+@dataclass
+class DirectCsv:
+    """CSV export URLs captured from the browser, replayed over plain HTTP."""
+
+    session: aiohttp.ClientSession
+    # spec.key -> export URL with the site id replaced by {SITE_ID}
+    templates: Dict[str, str] = field(default_factory=dict)
+    cookies_seeded: bool = False
+
+    async def capture(self, page, spec: PullSpec, site_id: int, url: str) -> None:
+        if spec.key in self.templates or not url.startswith("http"):
+            return
+        escaped = url.replace("{", "{{").replace("}", "}}")
+        template, n = re.subn(
+            rf"([?&]site=){site_id}(?=[&#]|$)", r"\g<1>{SITE_ID}", escaped
+        )
+        if n != 1:
+            # not keyed by site id (e.g. a generated blob), can't be replayed
+            return
+
+        if not self.cookies_seeded:
+            self.cookies_seeded = True
+            for c in await page.context.cookies():
+                domain = c["domain"].lstrip(".")
+                self.session.cookie_jar.update_cookies(
+                    {c["name"]: c["value"]}, URL(f"https://{domain}/")
+                )
+
+        self.templates[spec.key] = template
+        print(f"   captured direct CSV endpoint for {spec.key}", flush=True)
+
+    async def fetch(
+        self, spec: PullSpec, site_id: int, slug: str, out_path: str
+    ) -> bool:
+        template = self.templates.get(spec.key)
+        if template is None:
+            return False
+
+        url = template.format(SITE_ID=site_id)
+        try:
+            async with self.session.get(url) as r:
+                if r.status >= 400 or r.content_type == "text/html":
+                    return False
+                body = await r.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+        if not is_site_csv(body, slug):
+            # an error page or payload; don't let it pass for a complete CSV
+            return False
+
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        await write_bytes_atomic(out_path, body)
+        return True
+
+
+def option_ids(node) -> Optional[list[int]]:
+    """Ids of a select2-style option list, groups flattened; else None."""
+    if not isinstance(node, list) or not node:
+        return None
+    ids = []
+    for item in node:
+        if not isinstance(item, dict):
+            return None
+        children = item.get("children")
+        if isinstance(children, list):
+            child_ids = option_ids(children)
+            if child_ids is None:
+                return None
+            ids.extend(child_ids)
+            continue
+        raw_id = item.get("id", item.get("value"))
+        label = item.get("text", item.get("name", item.get("label")))
+        if not isinstance(label, str) or not str(raw_id).isdigit():
+            return None
+        ids.append(int(raw_id))
+    return ids
+
+
+def site_ids_from_json(payload) -> list[int]:
+    """Ids of the site option list in a payload, or [] if there is none.
+
+    Only the payload itself or a list under a key mentioning "site" counts,
+    so other selects shipped alongside (sexes, races, ...) are never taken;
+    the first match in document order wins.
+    """
+    stack = [(None, payload)]
+    while stack:
+        key, node = stack.pop()
+        if key is None or "site" in key.lower():
+            ids = option_ids(node)
+            if ids:
+                return ids
+        if isinstance(node, dict):
+            children = [(str(k), v) for k, v in node.items()]
+        elif isinstance(node, list):
+            children = [(key, v) for v in node]
+        else:
+            continue
+        # reversed so pop() visits them in document order
+        stack.extend(reversed(children))
+    return []
+
+
+def looks_like_site_list(ids: list[int]) -> bool:
+    return len(ids) >= SITE_LIST_MIN_IDS and len(set(ids)) == len(ids)
 
 
 async def get_all_site_ids(page) -> list[int]:
     bootstrap_url = SPECS[0].url_template.format(SITE_ID=0)
-    await page.goto(bootstrap_url, wait_until="domcontentloaded", timeout=45_000)
+
+    # the site select is filled from a JSON asset; reading that response is
+    # far cheaper than scrolling the rendered dropdown
+    listed = asyncio.get_running_loop().create_future()
+
+    async def on_response(response) -> None:
+        path = response.url.split("?", 1)[0].lower()
+        if listed.done() or "site" not in path or not path.endswith(".json"):
+            return
+        try:
+            payload = await response.json()
+        except (PlaywrightError, ValueError):
+            return
+        ids = site_ids_from_json(payload)
+        if not ids or listed.done():
+            return
+        if not looks_like_site_list(ids):
+            print(
+                f"   ignoring implausible site list ({len(ids)} ids) from "
+                f"{response.url}",
+                flush=True,
+            )
+            return
+        listed.set_result(ids)
+
+    page.on("response", on_response)
+    try:
+        await page.goto(bootstrap_url, wait_until="commit", timeout=30_000)
+        ids = await asyncio.wait_for(listed, timeout=SITE_LIST_TIMEOUT)
+        return sorted(ids)
+    except asyncio.TimeoutError:
+        print("   site list not intercepted, reading the dropdown", flush=True)
+    finally:
+        page.remove_listener("response", on_response)
 
     await page.click("#select2-Select_site-container")
     await page.wait_for_selector("#select2-Select_site-results", timeout=20_000)
 
-    def _extract_script() -> str:
-        return """
-        () => {
-            const els = Array.from(document.querySelectorAll('#select2-Select_site-results li.select2-results__option[id]'));
-            const ids = [];
-            for (const el of els) {
-                const m = el.id.match(/-(\\d+)$/);
-                if (m) ids.push(parseInt(m[1], 10));
-            }
-            return ids;
-        }
+    # select2 appends results as the list is scrolled. The whole scroll loop
+    # runs in the page: a round ends on the next DOM change or after 200ms, and
+    # six quiet rounds in a row without a new id means the list is exhausted.
+    # A list that keeps mutating without settling is cut off at the deadline.
+    result = await page.evaluate(
         """
+        async (deadlineMs) => {
+            const deadline = Date.now() + deadlineMs;
+            const ul = document.querySelector('#select2-Select_site-results');
+            if (!ul) return { ids: [], exhausted: true };
+            const scroller = ul.closest('.select2-results') || ul;
+            const ids = new Set();
+            let wake = () => {};
+            const observer = new MutationObserver(() => wake());
+            observer.observe(ul, { childList: true, subtree: true });
+
+            let stable = 0;
+            let prev = -1;
+            let idle = false;
+            while (stable < 6 && Date.now() < deadline) {
+                for (const el of ul.querySelectorAll('li.select2-results__option[id]')) {
+                    const m = el.id.match(/-(\\d+)$/);
+                    if (m) ids.add(parseInt(m[1], 10));
+                }
+                // only a quiet round counts: a "loading more" placeholder
+                // mutates the list without adding ids
+                if (ids.size !== prev) stable = 0;
+                else if (idle) stable++;
+                prev = ids.size;
 
-    seen: set[int] = set()
-    stable_rounds = 0
-
-    while stable_rounds < 6:
-        ids = await page.evaluate(_extract_script())
-        before = len(seen)
-        for x in ids:
-            seen.add(x)
-        after = len(seen)
-
-        stable_rounds = stable_rounds + 1 if after == before else 0
-
-        await page.evaluate(
-            """
-            () => {
-                const ul = document.querySelector('#select2-Select_site-results');
-                if (!ul) return;
-                const parent = ul.parentElement;
-                const scroller = parent && parent.classList.contains('select2-results')
-                    ? parent
-                    : ul.closest('.select2-results') || ul;
                 scroller.scrollTop = scroller.scrollHeight;
+                idle = await new Promise((resolve) => {
+                    wake = () => resolve(false);
+                    setTimeout(() => resolve(true), 200);
+                });
+                await new Promise((resolve) => requestAnimationFrame(resolve));
             }
-            """
+
+            observer.disconnect();
+            return { ids: [...ids].sort((a, b) => a - b), exhausted: stable >= 6 };
+        }
+        """,
+        SITE_SCROLL_DEADLINE_MS,
+    )
+    if not result["exhausted"]:
+        print(
+            f"   site dropdown still changing after {SITE_SCROLL_DEADLINE_MS}ms, "
+            f"using the {len(result['ids'])} ids seen so far",
+            flush=True,
         )
-        await page.wait_for_timeout(250)
 
     await page.keyboard.press("Escape")
-    return sorted(seen)
+    return result["ids"]
+
+
+async def block_noise(route) -> None:
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        part in request.url for part in BLOCKED_URL_PARTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def new_context(browser, state_path: str):
+    # reuse the cookies/local storage of an earlier session so the app
+    # doesn't have to initialise them again on every context
+    context = await browser.new_context(
+        accept_downloads=True,
+        viewport=VIEWPORT,
+        storage_state=state_path if os.path.exists(state_path) else None,
+    )
+    await context.route("**/*", block_noise)
+    return context
+
 
+async def new_persistent_context(p, profile_dir: str):
+    # no context.route here: routing turns off Playwright's HTTP cache, which
+    # is the whole point of the profile. Pages block noise via CDP instead,
+    # see new_page().
+    return await p.chromium.launch_persistent_context(
+        profile_dir,
+        headless=True,
+        args=CHROMIUM_ARGS,
+        chromium_sandbox=False,
+        accept_downloads=True,
+        viewport=VIEWPORT,
+    )
 
-def file_ok(path: str) -> bool:
-    return os.path.exists(path) and os.path.getsize(path) > 0
 
+async def block_noise_cdp(page) -> None:
+    cdp = await page.context.new_cdp_session(page)
+    await cdp.send("Network.enable")
+    await cdp.send("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
 
-def is_site_complete(out_dir: str, slug: str) -> bool:
+
+async def new_page(context, cdp_block: bool):
+    page = await context.new_page()
+    # persistent contexts block via CDP so the HTTP cache stays on
+    if cdp_block:
+        await block_noise_cdp(page)
+    return page
+
+
+def dumps_json(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(obj, ensure_ascii=False, indent=2, sort_keys=True).encode(
+        "utf-8"
+    )
+
+
+async def write_json_atomic(path: str, obj) -> None:
+    # serialize a snapshot off the event loop so workers keep running, and
+    # so the dict can't change size mid-dump
+    data = await asyncio.to_thread(dumps_json, dict(obj))
+    await write_bytes_atomic(path, data)
+
+
+def scan_complete(out_dir: str) -> Dict[str, set[str]]:
+    """Slugs with a non-empty CSV on disk, per spec key."""
+    complete: Dict[str, set[str]] = {}
     for spec in SPECS:
-        p = os.path.join(out_dir, spec.key, f"{slug}.csv")
-        if not file_ok(p):
+        with os.scandir(os.path.join(out_dir, spec.key)) as it:
+            complete[spec.key] = {
+                e.name[: -len(".csv")]
+                for e in it
+                if e.name.endswith(".csv") and e.is_file() and e.stat().st_size > 0
+            }
+    return complete
+
+
+def is_site_complete(complete: Dict[str, set[str]], slug: str) -> bool:
+    return all(slug in complete[spec.key] for spec in SPECS)
+
+
+async def probe_live_ids(
+    session: aiohttp.ClientSession,
+    url_template: str,
+    site_ids: list[int],
+    id_map: Dict[str, str],
+    min_bytes: int,
+) -> list[int]:
+    """Drop never-seen site ids whose probe URL doesn't look like real data."""
+    limit = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+    async def alive(site_id: int) -> bool:
+        if str(site_id) in id_map:
+            return True
+        url = url_template.format(SITE_ID=site_id)
+        async with limit:
+            try:
+                async with session.head(url, allow_redirects=False) as r:
+                    status = r.status
+                    size = r.content_length
+                if status in (405, 501):
+                    # HEAD not supported, ask properly
+                    async with session.get(url, allow_redirects=False) as r:
+                        status = r.status
+                        size = len(await r.read())
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # can't tell, let the browser decide
+                return True
+
+        # only a definite answer drops an id: 404/410, or a 200 too small to
+        # be data. Throttling, server errors, redirects etc. keep it.
+        if status in (404, 410):
             return False
-    return True
+        if status == 200 and size is not None and size < min_bytes:
+            return False
+        return True
+
+    alives = await asyncio.gather(*(alive(site_id) for site_id in site_ids))
+    return [site_id for site_id, ok in zip(site_ids, alives) if ok]
 
 
 async def pull_one_site(
-    page, site_id: int, out_dir: str, name_map: Dict[str, str]
+    page,
+    site_id: int,
+    out_dir: str,
+    name_map: Dict[str, str],
+    id_map: Dict[str, str],
+    direct: DirectCsv,
+    tabs: asyncio.Semaphore,
+    complete: Dict[str, set[str]],
+    timeouts: Timeouts,
+    cdp_block: bool,
+    bootstrap: Optional[asyncio.Task] = None,
 ) -> bool:
-    first_url = SPECS[0].url_template.format(SITE_ID=site_id)
-    try:
-        await page.goto(first_url, wait_until="domcontentloaded", timeout=45_000)
-    except PlaywrightTimeoutError:
-        return False
-
-    site_name = await get_site_name(page)
-    if not site_name:
-        return False
+    # site ids seen on a previous run already have a slug, so completed sites
+    # are skipped without touching the network and the bootstrap visit is only
+    # paid once per site id
+    loaded_url: Optional[str] = None
+    slug = id_map.get(str(site_id))
+    if slug is None:
+        # bootstrap: the worker already started bootstrap_site on this page
+        if bootstrap is None:
+            site_name = await bootstrap_site(page, site_id, tabs, timeouts)
+        else:
+            site_name = await bootstrap
+        if not site_name:
+            return False
+        loaded_url = SPECS[0].url_template.format(SITE_ID=site_id)
 
-    slug = slugify_site_name(site_name)
-    name_map.setdefault(slug, site_name)
+        slug = slugify_site_name(site_name)
+        name_map.setdefault(slug, site_name)
+        id_map[str(site_id)] = slug
 
-    if is_site_complete(out_dir, slug):
+    if is_site_complete(complete, slug):
         print(f"   SKIP (complete): {slug}", flush=True)
         return True
 
     ok_any = False
 
+    pending = []
     for spec in SPECS:
         out_path = os.path.join(out_dir, spec.key, f"{slug}.csv")
 
-        if file_ok(out_path):
+        if slug in complete[spec.key]:
             ok_any = True
             continue
+        pending.append((spec, out_path))
 
-        url = spec.url_template.format(SITE_ID=site_id)
-        try:
-            await page.goto(url, wait_until="domcontentloaded", timeout=45_000)
-        except PlaywrightTimeoutError:
-            continue
+    # replay known export URLs without rendering the app; anything that can't
+    # be fetched directly falls back to the browser below
+    fetched = await asyncio.gather(
+        *(direct.fetch(spec, site_id, slug, out_path) for spec, out_path in pending)
+    )
 
-        ok = await download_csv(page, out_path)
-        ok_any = ok_any or ok
+    fallback = []
+    for (spec, out_path), ok in zip(pending, fetched):
+        if ok:
+            ok_any = True
+            complete[spec.key].add(slug)
+        else:
+            fallback.append((spec, out_path))
 
+    # the specs are independent, so pull them side by side: the first on the
+    # worker's own page, the rest in extra tabs of the same context
+    pulled = await asyncio.gather(
+        *(
+            pull_spec(
+                page,
+                spec,
+                site_id,
+                out_path,
+                direct,
+                tabs,
+                timeouts,
+                cdp_block,
+                on_page=i == 0,
+                loaded_url=loaded_url,
+            )
+            for i, (spec, out_path) in enumerate(fallback)
+        )
+    )
+    for (spec, _), ok in zip(fallback, pulled):
+        if ok:
+            ok_any = True
+            complete[spec.key].add(slug)
     return ok_any
 
 
+async def pull_spec(
+    page,
+    spec: PullSpec,
+    site_id: int,
+    out_path: str,
+    direct: DirectCsv,
+    tabs: asyncio.Semaphore,
+    timeouts: Timeouts,
+    cdp_block: bool,
+    on_page: bool,
+    loaded_url: Optional[str],
+) -> bool:
+    url = spec.url_template.format(SITE_ID=site_id)
+    async with tabs:
+        tab = page if on_page else await new_page(page.context, cdp_block)
+        try:
+            # the worker page may still be showing this spec from the bootstrap
+            warm = tab is page and url == loaded_url
+            if not warm and not await open_page(tab, url, timeouts):
+                return False
+
+            csv_url = await download_csv(tab, out_path, timeouts, warm)
+            if csv_url is None:
+                return False
+            await direct.capture(tab, spec, site_id, csv_url)
+            return True
+        finally:
+            if tab is not page:
+                await tab.close()
+
+
 def fmt_seconds(seconds: float) -> str:
     if seconds <= 0:
         return "0s"
@@ -190,92 +750,358 @@ def fmt_seconds(seconds: float) -> str:
     return f"{s}s"
 
 
+@dataclass
+class RunState:
+    site_ids: list[int]
+    progress: Dict[str, Optional[int]]
+    progress_path: str
+    id_map_path: str
+    stop_after_consecutive_misses: int
+    workers: int
+    # pages block noise over CDP instead of context.route (profile mode)
+    cdp_block: bool
+    next_idx: int
+    t0: float
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    misses: int = 0
+    stopped: bool = False
+    done: set[int] = field(default_factory=set)
+    # progress advances not yet written to progress.json
+    progress_dirty: int = 0
+    # len(id_map) as of the last write of site_id_map.json
+    id_map_flushed: int = 0
+    # last 3 successful site durations (seconds)
+    last3: deque = field(default_factory=lambda: deque(maxlen=3))
+    last3_sum: float = 0.0
+
+
+def print_status(run: RunState, site_id: int) -> None:
+    total = len(run.site_ids)
+    completed = run.next_idx + len(run.done)
+    remaining = total - completed
+    elapsed = time.monotonic() - run.t0
+    percent = (completed / total) * 100 if total > 0 else 0.0
+
+    # ETA based on last 3 completed sites, spread over the worker pool
+    if len(run.last3) > 0:
+        avg = run.last3_sum / len(run.last3)
+        eta = avg * remaining / run.workers
+        eta_str = fmt_seconds(eta)
+        avg_str = f"{avg:.2f}s/site(3)"
+    else:
+        eta_str = "n/a"
+        avg_str = "n/a"
+
+    print(
+        f"[{completed}/{total}] {percent:6.2f}% | "
+        f"site={site_id} | remaining={remaining} | "
+        f"elapsed={fmt_seconds(elapsed)} | ETA={eta_str} | avg={avg_str}",
+        flush=True,
+    )
+
+
+def drain(queue: asyncio.Queue) -> None:
+    while not queue.empty():
+        queue.get_nowait()
+        queue.task_done()
+
+
+def prefetch(
+    page,
+    site_id: int,
+    id_map: Dict[str, str],
+    tabs: asyncio.Semaphore,
+    timeouts: Timeouts,
+) -> Optional[asyncio.Task]:
+    # only a site without a known slug needs its bootstrap page
+    if str(site_id) in id_map:
+        return None
+    return asyncio.create_task(bootstrap_site(page, site_id, tabs, timeouts))
+
+
+def discard(task: Optional[asyncio.Task]) -> None:
+    if task is None:
+        return
+    task.cancel()
+    # a prefetch that already failed must not log "exception never retrieved"
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+
+async def worker(
+    pages: list,
+    queue: asyncio.Queue,
+    out_dir: str,
+    name_map: Dict[str, str],
+    id_map: Dict[str, str],
+    direct: DirectCsv,
+    tabs: asyncio.Semaphore,
+    complete: Dict[str, set[str]],
+    timeouts: Timeouts,
+    run: RunState,
+) -> None:
+    # double-buffered over two pages: while one pulls the current site, the
+    # other is already loading the next site's bootstrap page
+    held = None
+    while True:
+        if held is None:
+            idx, site_id = await queue.get()
+            page, nav = pages[0], None
+        else:
+            idx, site_id, page, nav = held
+            held = None
+        try:
+            if run.stopped:
+                discard(nav)
+                continue
+
+            print_status(run, site_id)
+
+            site_start = time.monotonic()
+            if not queue.empty():
+                spare = pages[1] if page is pages[0] else pages[0]
+                next_idx, next_site = queue.get_nowait()
+                next_nav = prefetch(spare, next_site, id_map, tabs, timeouts)
+                if next_nav is not None:
+                    held = (next_idx, next_site, spare, next_nav)
+                else:
+                    # nothing to prefetch; leave it to whichever worker is free
+                    queue.put_nowait((next_idx, next_site))
+                    queue.task_done()
+
+            ok = await pull_one_site(
+                page,
+                site_id,
+                out_dir,
+                name_map,
+                id_map,
+                direct,
+                tabs,
+                complete,
+                timeouts,
+                run.cdp_block,
+                bootstrap=nav,
+            )
+            site_dur = time.monotonic() - site_start
+
+            async with run.lock:
+                if ok:
+                    run.misses = 0
+                    if len(run.last3) == run.last3.maxlen:
+                        run.last3_sum -= run.last3[0]
+                    run.last3.append(site_dur)
+                    run.last3_sum += site_dur
+                else:
+                    run.misses += 1
+                    if (
+                        not run.stopped
+                        and run.misses >= run.stop_after_consecutive_misses
+                    ):
+                        print(
+                            f"Stopping after {run.misses} consecutive misses.",
+                            flush=True,
+                        )
+                        run.stopped = True
+                        drain(queue)
+
+                # only advance past sites whose predecessors are all done, so a
+                # resume never skips a site that was still in flight
+                run.done.add(idx)
+                last_site = None
+                before = run.next_idx
+                while run.next_idx in run.done:
+                    run.done.remove(run.next_idx)
+                    last_site = run.site_ids[run.next_idx]
+                    run.next_idx += 1
+                if last_site is not None:
+                    run.progress["last_site_id"] = last_site
+                    run.progress_dirty += run.next_idx - before
+                if run.progress_dirty >= PROGRESS_FLUSH_EVERY or (
+                    run.stopped and run.progress_dirty
+                ):
+                    run.progress_dirty = 0
+                    await write_json_atomic(run.progress_path, run.progress)
+
+                if len(id_map) - run.id_map_flushed >= ID_MAP_FLUSH_EVERY:
+                    run.id_map_flushed = len(id_map)
+                    await write_json_atomic(run.id_map_path, id_map)
+        except BaseException:
+            # cancelled mid-site: don't leave the next site's prefetch running
+            if held is not None:
+                discard(held[3])
+            raise
+        finally:
+            queue.task_done()
+
+
 async def main(
     out_dir: str = "out",
     stop_after_consecutive_misses: int = 30,
+    workers: int = 8,
+    max_tabs: int = 16,
+    profile_dir: Optional[str] = None,
+    probe_url_template: Optional[str] = None,
+    probe_min_bytes: int = 0,
 ) -> None:
     os.makedirs(out_dir, exist_ok=True)
     for spec in SPECS:
         os.makedirs(os.path.join(out_dir, spec.key), exist_ok=True)
+    # one directory scan per spec up front instead of stat calls per site;
+    # kept current as CSVs are written
+    complete = scan_complete(out_dir)
 
     name_map_path = os.path.join(out_dir, "site_name_map.json")
+    id_map_path = os.path.join(out_dir, "site_id_map.json")
     progress_path = os.path.join(out_dir, "progress.json")
+    state_path = os.path.join(out_dir, "seer_state.json")
 
     name_map: Dict[str, str] = {}
     if os.path.exists(name_map_path):
         with open(name_map_path, "r", encoding="utf-8") as f:
             name_map = json.load(f)
 
+    # site_id (as str, JSON keys are strings) -> slug
+    id_map: Dict[str, str] = {}
+    if os.path.exists(id_map_path):
+        with open(id_map_path, "r", encoding="utf-8") as f:
+            id_map = json.load(f)
+
     progress: Dict[str, Optional[int]] = {"last_site_id": None}
     if os.path.exists(progress_path):
         with open(progress_path, "r", encoding="utf-8") as f:
             progress = json.load(f)
 
-    misses = 0
-
-    # last 3 successful site durations (seconds)
-    last3 = deque(maxlen=3)
+    async with async_playwright() as p, aiohttp.ClientSession(
+        timeout=aiohttp.ClientTimeout(total=45)
+    ) as session:
+        direct = DirectCsv(session=session)
+        # caps pages loading at once across all workers: spec pulls and
+        # bootstrap visits, prefetched or not, until their app is ready
+        tabs = asyncio.Semaphore(max_tabs)
+        # shared so every worker tightens on what the whole pool has seen
+        timeouts = Timeouts()
+        cdp_block = bool(profile_dir)
+        if profile_dir:
+            # an on-disk profile keeps the HTTP cache across runs, so the app's
+            # static assets come from disk; all workers share its one context
+            browser = None
+            contexts = [await new_persistent_context(p, profile_dir)]
+        else:
+            browser = await p.chromium.launch(
+                headless=True, args=CHROMIUM_ARGS, chromium_sandbox=False
+            )
+            contexts = [await new_context(browser, state_path)]
+        if contexts[0].pages:
+            # launch_persistent_context opens a page of its own; use it
+            first_page = contexts[0].pages[0]
+            if cdp_block:
+                await block_noise_cdp(first_page)
+        else:
+            first_page = await new_page(contexts[0], cdp_block)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(accept_downloads=True)
-        page = await context.new_page()
+        site_ids = await get_all_site_ids(first_page)
 
-        site_ids = await get_all_site_ids(page)
-        total = len(site_ids)
+        # two pages per worker, see worker()
+        pages = [[first_page, await new_page(contexts[0], cdp_block)]]
+        if browser is None:
+            for _ in range(workers - 1):
+                pages.append(
+                    [
+                        await new_page(contexts[0], cdp_block),
+                        await new_page(contexts[0], cdp_block),
+                    ]
+                )
+        else:
+            # one context per worker: isolated cookies/downloads, shared
+            # browser, all seeded from the session that listed the sites
+            await contexts[0].storage_state(path=state_path)
+            for _ in range(workers - 1):
+                context = await new_context(browser, state_path)
+                contexts.append(context)
+                pages.append(
+                    [
+                        await new_page(context, cdp_block),
+                        await new_page(context, cdp_block),
+                    ]
+                )
 
         start_idx = 0
         last_site = progress.get("last_site_id")
         if last_site is not None and last_site in site_ids:
             start_idx = site_ids.index(last_site) + 1
 
-        t0 = time.time()
-
-        for idx, site_id in enumerate(site_ids[start_idx:], start=start_idx):
-            completed = idx
-            remaining = total - completed
-            elapsed = time.time() - t0
-            percent = (completed / total) * 100 if total > 0 else 0.0
-
-            # ETA based on last 3 completed sites
-            if len(last3) > 0:
-                avg = sum(last3) / len(last3)
-                eta = avg * remaining
-                eta_str = fmt_seconds(eta)
-                avg_str = f"{avg:.2f}s/site(3)"
-            else:
-                eta_str = "n/a"
-                avg_str = "n/a"
-
-            print(
-                f"[{completed}/{total}] {percent:6.2f}% | "
-                f"site={site_id} | remaining={remaining} | "
-                f"elapsed={fmt_seconds(elapsed)} | ETA={eta_str} | avg={avg_str}",
-                flush=True,
+        if probe_url_template:
+            # a cheap HEAD per unseen id instead of browser timeouts on dead
+            # ones; ids before the resume point stay so progress still lines up
+            todo = site_ids[start_idx:]
+            live = await probe_live_ids(
+                session, probe_url_template, todo, id_map, probe_min_bytes
             )
+            skipped = len(todo) - len(live)
+            print(f"   probe: skipping {skipped} dead site ids", flush=True)
+            site_ids = site_ids[:start_idx] + live
 
-            site_start = time.time()
-            ok = await pull_one_site(page, site_id, out_dir, name_map)
-            site_dur = time.time() - site_start
+        run = RunState(
+            site_ids=site_ids,
+            progress=progress,
+            progress_path=progress_path,
+            id_map_path=id_map_path,
+            stop_after_consecutive_misses=stop_after_consecutive_misses,
+            workers=workers,
+            cdp_block=cdp_block,
+            next_idx=start_idx,
+            t0=time.monotonic(),
+            id_map_flushed=len(id_map),
+        )
 
-            if ok:
-                misses = 0
-                last3.append(site_dur)
-            else:
-                misses += 1
-                if misses >= stop_after_consecutive_misses:
-                    print(f"Stopping after {misses} consecutive misses.", flush=True)
-                    break
+        # ordered by idx, so a site a worker hands back keeps its place
+        queue: asyncio.Queue = asyncio.PriorityQueue()
+        for idx, site_id in enumerate(site_ids[start_idx:], start=start_idx):
+            queue.put_nowait((idx, site_id))
 
-            progress["last_site_id"] = site_id
-            with open(progress_path, "w", encoding="utf-8") as f:
-                json.dump(progress, f, indent=2)
+        tasks = [
+            asyncio.create_task(
+                worker(
+                    worker_pages,
+                    queue,
+                    out_dir,
+                    name_map,
+                    id_map,
+                    direct,
+                    tabs,
+                    complete,
+                    timeouts,
+                    run,
+                )
+            )
+            for worker_pages in pages
+        ]
+        # also reached on Ctrl-C (asyncio.run cancels main), so a long run
+        # never loses its resume state
+        try:
+            joiner = asyncio.create_task(queue.join())
+            # workers only return early by raising; don't wait on the queue
+            await asyncio.wait([joiner, *tasks], return_when=asyncio.FIRST_COMPLETED)
+            for t in [joiner, *tasks]:
+                t.cancel()
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            # workers may still be mid-write on Ctrl-C; let them finish so an
+            # older snapshot can't land on top of this one
+            async with run.lock:
+                await asyncio.gather(
+                    write_json_atomic(progress_path, progress),
+                    write_json_atomic(name_map_path, name_map),
+                    write_json_atomic(id_map_path, id_map),
+                )
 
-        await context.close()
-        await browser.close()
+        for context in contexts:
+            await context.close()
+        if browser is not None:
+            await browser.close()
 
-    with open(name_map_path, "w", encoding="utf-8") as f:
-        json.dump(name_map, f, ensure_ascii=False, indent=2, sort_keys=True)
+    for r in results:
+        if isinstance(r, Exception):
+            raise r
 
 
 if __name__ == "__main__":